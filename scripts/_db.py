@@ -0,0 +1,50 @@
+import atexit
+import sqlite3
+from functools import lru_cache
+from pathlib import Path
+
+# Define paths relative to script location
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+DB_PATH = PROJECT_ROOT / "database" / "arxiv_docs.db"
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA temp_store=MEMORY",
+)
+
+def close_conn(conn):
+    """Refresh planner statistics where needed and close the connection"""
+    try:
+        conn.execute("PRAGMA optimize")
+    except sqlite3.Error:
+        pass
+    conn.close()
+
+def get_conn(db_path=DB_PATH):
+    """Return the shared connection for db_path, opening it on first use"""
+    # Resolve first so every spelling of a path shares one connection
+    return _open_conn(Path(db_path).resolve())
+
+@lru_cache(maxsize=None)
+def _open_conn(db_path):
+    conn = sqlite3.connect(db_path)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    atexit.register(close_conn, conn)
+    return conn
+
+def get_read_conn(db_path=DB_PATH):
+    """Return a shared read-only connection for db_path that leaves transactions to the caller"""
+    return _open_read_conn(Path(db_path).resolve())
+
+@lru_cache(maxsize=None)
+def _open_read_conn(db_path):
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    for pragma in PRAGMAS + ("PRAGMA query_only=1",):
+        conn.execute(pragma)
+    atexit.register(close_conn, conn)
+    return conn
@@ -1,5 +1,6 @@
 import sqlite3
 from pathlib import Path
+from _db import get_conn
 
 # Define paths relative to script location
 SCRIPT_DIR = Path(__file__).parent
@@ -14,7 +15,8 @@ def clear_database():
             print(f"Database not found at: {DB_PATH}")
             return
             
-        conn = sqlite3.connect(DB_PATH)
+        # Shared connection, also used by the steps that follow
+        conn = get_conn(DB_PATH)
         cursor = conn.cursor()
         
         # Get table names to verify they exist
@@ -46,9 +48,6 @@ def clear_database():
     except sqlite3.Error as e:
         print(f"Database error: {e}")
         raise
-    finally:
-        if 'conn' in locals():
-            conn.close()
 
 if __name__ == "__main__":
     clear_database()
\ No newline at end of file
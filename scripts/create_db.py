@@ -13,6 +13,9 @@ def create_database():
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
 
+    # WAL mode is persisted in the database file, so every later connection uses it
+    c.execute("PRAGMA journal_mode=WAL")
+
     # Create table for full documents
     c.execute('''CREATE TABLE IF NOT EXISTS full_documents (
                  id TEXT PRIMARY KEY,
@@ -27,6 +30,9 @@ def create_database():
                  id TEXT PRIMARY KEY,
                  summary TEXT)''')
 
+    # Covering index so listing papers by id and title never reads the large text columns
+    c.execute('CREATE INDEX IF NOT EXISTS idx_full_docs_id_title ON full_documents(id, title)')
+
     conn.commit()
     conn.close()
     print(f"Database created at {DB_PATH}")
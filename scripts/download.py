@@ -1,6 +1,10 @@
+import urllib3
 import requests
-import sqlite3
+from requests.adapters import HTTPAdapter
 import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from _db import get_conn
 
 # Define the database path
 DB_PATH = os.path.join(os.path.dirname(__file__), '../database/arxiv_docs.db')
@@ -8,19 +12,49 @@ DB_PATH = os.path.join(os.path.dirname(__file__), '../database/arxiv_docs.db')
 # Define the path to store downloaded PDFs
 PDF_DIR = os.path.join(os.path.dirname(__file__), '../pdfs/')
 
+# Shared session so every download reuses the same keep-alive connections
+SESSION = requests.Session()
+ADAPTER = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=3)
+SESSION.mount('https://', ADAPTER)
+SESSION.mount('http://', ADAPTER)
+# PDFs are already compressed
+SESSION.headers.update({'Accept-Encoding': 'identity'})
+
+# Number of concurrent downloads
+MAX_WORKERS = 8
+
+def download_pdf(document):
+    """Download a single PDF unless it is already on disk"""
+    id, url = document
+    pdf_path = os.path.join(PDF_DIR, f'{id}.pdf')
+    if os.path.exists(pdf_path):
+        return
+
+    part_path = f'{pdf_path}.part'
+    try:
+        with SESSION.get(url, timeout=30, stream=True) as response:
+            if response.status_code == 200:
+                # Copy the body straight from the socket to disk in 1 MiB blocks,
+                # into a temporary file so an interrupted download never looks complete
+                response.raw.decode_content = True
+                with open(part_path, 'wb') as file:
+                    shutil.copyfileobj(response.raw, file, length=1 << 20)
+                os.replace(part_path, pdf_path)
+    except (requests.RequestException, urllib3.exceptions.HTTPError, OSError) as e:
+        # Reading response.raw raises urllib3's own errors for truncated or
+        # stalled bodies; one failed PDF must not stop the others
+        print(f"Failed to download {url}: {e}")
+    finally:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+
 def download_pdfs():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
+    c = get_conn(DB_PATH).cursor()
     c.execute('SELECT id, pdf_url FROM full_documents WHERE pdf_url IS NOT NULL')
     documents = c.fetchall()
-    conn.close()
-
-    for id, pdf_path in documents:
-        response = requests.get(pdf_path)
-        if response.status_code == 200:
-            pdf_path = os.path.join(PDF_DIR, f'{id}.pdf')
-            with open(pdf_path, 'wb') as file:
-                file.write(response.content)
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        list(executor.map(download_pdf, documents))
 
 def download_job():
     download_pdfs()
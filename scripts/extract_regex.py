@@ -1,7 +1,14 @@
+import logging
+import os
 import sqlite3
-import json
 import re
+import ijson
+import orjson
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from _db import get_conn
+
+_log = logging.getLogger(__name__)
 
 # Define paths relative to script location
 SCRIPT_DIR = Path(__file__).parent
@@ -9,265 +16,342 @@ PROJECT_ROOT = SCRIPT_DIR.parent
 DB_PATH = PROJECT_ROOT / "database" / "arxiv_docs.db"
 CONV_DIR = PROJECT_ROOT / "conversions"
 SECTIONS_JSON_PATH = CONV_DIR / "sections_regex.json"
+SECTIONS_JSONL_PATH = CONV_DIR / "sections_regex.jsonl"
+
+# Section patterns in priority order, compiled once at import time
+_SECTION_RES = {kind: tuple(re.compile(p, re.DOTALL | re.IGNORECASE) for p in patterns) for kind, patterns in {
+    # Abstract patterns (expanded)
+    'abstract': [
+        r'Abstract\s*\n(.*?)(?=\n\s*\d|\n\s*[A-Z][a-z]|\Z)',
+        r'ABSTRACT\s*\n(.*?)(?=\n\s*\d|\n\s*[A-Z][a-z]|\Z)',
+        r'Abstract\s*[-–—]\s*(.*?)(?=\n\s*\d|\n\s*[A-Z][a-z]|\Z)',
+        r'ABSTRACT\s*[-–—]\s*(.*?)(?=\n\s*\d|\n\s*[A-Z][a-z]|\Z)',
+        r'Abstract[:\.]?\s*(.*?)(?=\n\s*(?:\d+\.?\s*[A-Z]|Introduction|INTRODUCTION)|\Z)',
+        r'ABSTRACT[:\.]?\s*(.*?)(?=\n\s*(?:\d+\.?\s*[A-Z]|Introduction|INTRODUCTION)|\Z)'
+    ],
+    # Conclusion patterns (expanded)
+    'conclusion': [
+        r'(?:\d+\.?\s*)?Conclusion[s]?\s*\n(.*?)(?=\n\s*(?:Acknowledgement|ACKNOWLEDGEMENT|Reference|REFERENCE|\d+\.?\s*[A-Z])|\Z)',
+        r'(?:\d+\.?\s*)?CONCLUSION[S]?\s*\n(.*?)(?=\n\s*(?:Acknowledgement|ACKNOWLEDGEMENT|Reference|REFERENCE|\d+\.?\s*[A-Z])|\Z)',
+        r'Conclusion and Limitations\s*\n(.*?)(?=\n\s*(?:Acknowledgement|ACKNOWLEDGEMENT|Reference|REFERENCE|\d+\.?\s*[A-Z])|\Z)',
+        r'(?:\d+\.?\s*)?Conclusion[s]?[:\.]?\s*(.*?)(?=\n\s*(?:Acknowledgement|Reference|\d+\.?\s*[A-Z])|\Z)',
+        r'(?:\d+\.?\s*)?CONCLUSION[S]?[:\.]?\s*(.*?)(?=\n\s*(?:Acknowledgement|Reference|\d+\.?\s*[A-Z])|\Z)',
+        r'Concluding Remarks\s*\n(.*?)(?=\n\s*(?:Acknowledgement|Reference|\d+\.?\s*[A-Z])|\Z)'
+    ],
+    # Discussion patterns (expanded)
+    'discussion': [
+        r'(?:\d+\.?\s*)?Discussion\s*\n(.*?)(?=\n\s*(?:Conclusion|CONCLUSION|Acknowledgement|ACKNOWLEDGEMENT|Reference|REFERENCE|\d+\.?\s*[A-Z])|\Z)',
+        r'(?:\d+\.?\s*)?DISCUSSION\s*\n(.*?)(?=\n\s*(?:Conclusion|CONCLUSION|Acknowledgement|ACKNOWLEDGEMENT|Reference|REFERENCE|\d+\.?\s*[A-Z])|\Z)',
+        r'Discussion and Future Work\s*\n(.*?)(?=\n\s*(?:Conclusion|CONCLUSION|Acknowledgement|ACKNOWLEDGEMENT|Reference|REFERENCE|\d+\.?\s*[A-Z])|\Z)',
+        r'(?:\d+\.?\s*)?Discussion[:\.]?\s*(.*?)(?=\n\s*(?:Conclusion|Acknowledgement|Reference|\d+\.?\s*[A-Z])|\Z)',
+        r'Discussion and Analysis\s*\n(.*?)(?=\n\s*(?:Conclusion|Acknowledgement|Reference|\d+\.?\s*[A-Z])|\Z)'
+    ],
+}.items()}
+
+# Header anchors for every section kind; every section pattern can only
+# match starting at one of these headers
+_ANCHORS = {'abstract': 'abstract', 'conclusion': 'conclu', 'discussion': 'discussion'}
+_ANCHOR_RE = re.compile(r'(?P<abstract>Abstract)|(?P<conclusion>Conclu)|(?P<discussion>Discussion)',
+                        re.IGNORECASE)
+
+# Trailing references split
+_REFS_RE = re.compile(r'\n\s*References?|\n\s*REFERENCES?')
+
+def normalize_whitespace(text):
+    """Collapse every run of whitespace into a single space"""
+    return ' '.join(text.split())
+
+def section_text(kind, match):
+    """Clean up the body captured by a section pattern"""
+    text = normalize_whitespace(match.group(1).strip())
+    if kind != 'abstract':
+        text = _REFS_RE.split(text)[0]
+    return text
+
+def find_anchors(content):
+    """Return the (offset, kind) of every section header anchor in order"""
+    lowered = content.lower()
+    if len(lowered) != len(content):
+        # Lowercasing changed offsets, use the case-insensitive regex instead
+        return [(match.start(), match.lastgroup) for match in _ANCHOR_RE.finditer(content)]
+    
+    # str.find on the lowercased text is far cheaper than scanning with the regex
+    anchors = []
+    for kind, word in _ANCHORS.items():
+        offset = lowered.find(word)
+        while offset != -1:
+            anchors.append((offset, kind))
+            offset = lowered.find(word, offset + len(word))
+    anchors.sort()
+    return anchors
+
+def find_sections(content):
+    """Find the text of each section kind in a single pass over the header anchors
+
+    Each anchor is dispatched to the patterns of its kind, which are only
+    tried anchored at that header. A pattern's first match decides it, and
+    the section is taken from the highest priority pattern whose first
+    match passes the minimum length check.
+    """
+    first_matches = {kind: [None] * len(patterns) for kind, patterns in _SECTION_RES.items()}
+    found = {}
+    for start, kind in find_anchors(content):
+        if kind in found:
+            continue
+        resolved = first_matches[kind]
+        for priority, pattern in enumerate(_SECTION_RES[kind]):
+            if resolved[priority] is None:
+                match = pattern.match(content, start)
+                if match:
+                    text = section_text(kind, match)
+                    resolved[priority] = text if len(text) > 50 else ''  # Minimum length check
+        
+        # The kind is settled once every higher priority pattern has failed
+        for text in resolved:
+            if text is None:
+                break
+            if text:
+                found[kind] = text
+                break
+        if 'abstract' in found and 'conclusion' in found:
+            break
+    
+    # Kinds still unsettled at the end of the content: patterns that never
+    # matched count as failed
+    for kind, resolved in first_matches.items():
+        if kind not in found:
+            text = next((text for text in resolved if text), None)
+            if text:
+                found[kind] = text
+    return found
+
+def load_content(json_path):
+    """Reconstruct text content from the JSON structure"""
+    # Stream the text of each docling text element instead of loading the whole document
+    parts = []
+    with open(json_path, 'rb') as f:
+        for text in ijson.items(f, 'texts.item.text'):
+            parts.append(text.strip())
+    if parts:
+        return "\n\n".join(parts) + "\n\n"
+    
+    # Fall back to loading the whole file for other layouts
+    with open(json_path, 'rb') as f:
+        doc = orjson.loads(f.read())
+    if isinstance(doc, str):
+        # Handle case where the JSON contains direct text
+        return doc
+    elif isinstance(doc, dict) and 'text' in doc:
+        # Handle case where text is in root level
+        return doc['text']
+    return ""
 
 def extract_sections(json_path):
     """Extract sections using regex patterns from JSON content"""
     try:
-        with open(json_path) as f:
-            doc = json.load(f)
-            
-        # Reconstruct text content from the JSON structure
-        content = ""
-        if 'texts' in doc:
-            for text_element in doc['texts']:
-                if 'text' in text_element:
-                    content += text_element['text'].strip() + "\n\n"
-        elif isinstance(doc, str):
-            # Handle case where the JSON contains direct text
-            content = doc
-        elif isinstance(doc, dict) and 'text' in doc:
-            # Handle case where text is in root level
-            content = doc['text']
+        content = load_content(json_path)
             
         if not content.strip():
-            print(f"Warning: No content found in {json_path}")
+            _log.warning("No content found in %s", json_path)
             return {'abstract': None, 'conclusion': None}
             
-        print(f"\nDocument content preview ({len(content)} chars):")
-        preview = "\n".join(content.split("\n")[:5])
-        print(preview + "...")
+        if _log.isEnabledFor(logging.DEBUG):
+            preview = "\n".join(content.split("\n", 5)[:5])
+            _log.debug("Document content preview (%d chars):\n%s...", len(content), preview)
         
         sections = {
             'abstract': None,
             'conclusion': None
         }
         
-        # Extract Abstract patterns (expanded)
-        abstract_patterns = [
-            r'Abstract\s*\n(.*?)(?=\n\s*\d|\n\s*[A-Z][a-z]|\Z)',
-            r'ABSTRACT\s*\n(.*?)(?=\n\s*\d|\n\s*[A-Z][a-z]|\Z)',
-            r'Abstract\s*[-–—]\s*(.*?)(?=\n\s*\d|\n\s*[A-Z][a-z]|\Z)',
-            r'ABSTRACT\s*[-–—]\s*(.*?)(?=\n\s*\d|\n\s*[A-Z][a-z]|\Z)',
-            r'Abstract[:\.]?\s*(.*?)(?=\n\s*(?:\d+\.?\s*[A-Z]|Introduction|INTRODUCTION)|\Z)',
-            r'ABSTRACT[:\.]?\s*(.*?)(?=\n\s*(?:\d+\.?\s*[A-Z]|Introduction|INTRODUCTION)|\Z)'
-        ]
-        
-        # Extract Conclusion patterns (expanded)
-        conclusion_patterns = [
-            r'(?:\d+\.?\s*)?Conclusion[s]?\s*\n(.*?)(?=\n\s*(?:Acknowledgement|ACKNOWLEDGEMENT|Reference|REFERENCE|\d+\.?\s*[A-Z])|\Z)',
-            r'(?:\d+\.?\s*)?CONCLUSION[S]?\s*\n(.*?)(?=\n\s*(?:Acknowledgement|ACKNOWLEDGEMENT|Reference|REFERENCE|\d+\.?\s*[A-Z])|\Z)',
-            r'Conclusion and Limitations\s*\n(.*?)(?=\n\s*(?:Acknowledgement|ACKNOWLEDGEMENT|Reference|REFERENCE|\d+\.?\s*[A-Z])|\Z)',
-            r'(?:\d+\.?\s*)?Conclusion[s]?[:\.]?\s*(.*?)(?=\n\s*(?:Acknowledgement|Reference|\d+\.?\s*[A-Z])|\Z)',
-            r'(?:\d+\.?\s*)?CONCLUSION[S]?[:\.]?\s*(.*?)(?=\n\s*(?:Acknowledgement|Reference|\d+\.?\s*[A-Z])|\Z)',
-            r'Concluding Remarks\s*\n(.*?)(?=\n\s*(?:Acknowledgement|Reference|\d+\.?\s*[A-Z])|\Z)'
-        ]
-
-        # Extract Discussion patterns (expanded)
-        discussion_patterns = [
-            r'(?:\d+\.?\s*)?Discussion\s*\n(.*?)(?=\n\s*(?:Conclusion|CONCLUSION|Acknowledgement|ACKNOWLEDGEMENT|Reference|REFERENCE|\d+\.?\s*[A-Z])|\Z)',
-            r'(?:\d+\.?\s*)?DISCUSSION\s*\n(.*?)(?=\n\s*(?:Conclusion|CONCLUSION|Acknowledgement|ACKNOWLEDGEMENT|Reference|REFERENCE|\d+\.?\s*[A-Z])|\Z)',
-            r'Discussion and Future Work\s*\n(.*?)(?=\n\s*(?:Conclusion|CONCLUSION|Acknowledgement|ACKNOWLEDGEMENT|Reference|REFERENCE|\d+\.?\s*[A-Z])|\Z)',
-            r'(?:\d+\.?\s*)?Discussion[:\.]?\s*(.*?)(?=\n\s*(?:Conclusion|Acknowledgement|Reference|\d+\.?\s*[A-Z])|\Z)',
-            r'Discussion and Analysis\s*\n(.*?)(?=\n\s*(?:Conclusion|Acknowledgement|Reference|\d+\.?\s*[A-Z])|\Z)'
-        ]
+        # Find abstract and conclusion or discussion in one pass over the headers
+        found = find_sections(content)
 
-        # Find abstract
-        for pattern in abstract_patterns:
-            match = re.search(pattern, content, re.DOTALL | re.IGNORECASE)
-            if match:
-                abstract_text = match.group(1).strip()
-                abstract_text = re.sub(r'\s+', ' ', abstract_text)
-                if len(abstract_text) > 50:  # Minimum length check
-                    sections['abstract'] = abstract_text
-                    print(f"Found abstract ({len(abstract_text)} chars)")
-                    break
+        if 'abstract' in found:
+            sections['abstract'] = found['abstract']
+            _log.debug("Found abstract (%d chars)", len(found['abstract']))
 
-        # Find conclusion or discussion
-        conclusion_found = False
-        
-        # First try to find conclusion
-        for pattern in conclusion_patterns:
-            match = re.search(pattern, content, re.DOTALL | re.IGNORECASE)
-            if match:
-                conclusion_text = match.group(1).strip()
-                conclusion_text = re.sub(r'\s+', ' ', conclusion_text)
-                conclusion_text = re.split(r'\n\s*References?|\n\s*REFERENCES?', conclusion_text)[0]
-                if len(conclusion_text) > 50:  # Minimum length check
-                    sections['conclusion'] = conclusion_text
-                    print(f"Found conclusion ({len(conclusion_text)} chars)")
-                    conclusion_found = True
-                    break
-        
-        # If no conclusion found, look for discussion
-        if not conclusion_found:
-            for pattern in discussion_patterns:
-                match = re.search(pattern, content, re.DOTALL | re.IGNORECASE)
-                if match:
-                    discussion_text = match.group(1).strip()
-                    discussion_text = re.sub(r'\s+', ' ', discussion_text)
-                    discussion_text = re.split(r'\n\s*References?|\n\s*REFERENCES?', discussion_text)[0]
-                    if len(discussion_text) > 50:  # Minimum length check
-                        sections['conclusion'] = discussion_text
-                        print(f"Found discussion as conclusion ({len(discussion_text)} chars)")
-                        break
+        # If no conclusion found, fall back to discussion
+        if 'conclusion' in found:
+            sections['conclusion'] = found['conclusion']
+            _log.debug("Found conclusion (%d chars)", len(found['conclusion']))
+        elif 'discussion' in found:
+            sections['conclusion'] = found['discussion']
+            _log.debug("Found discussion as conclusion (%d chars)", len(found['discussion']))
         
         # Final validation
         if not sections['abstract'] and not sections['conclusion']:
-            print("Warning: No sections found in document")
+            _log.warning("No sections found in %s", json_path)
         elif not sections['abstract']:
-            print("Warning: No abstract found")
+            _log.warning("No abstract found in %s", json_path)
         elif not sections['conclusion']:
-            print("Warning: No conclusion found")
+            _log.warning("No conclusion found in %s", json_path)
             
         return sections
     except Exception as e:
-        print(f"Error processing {json_path}: {str(e)}")
-        print(f"Error type: {type(e)}")
-        import traceback
-        print(traceback.format_exc())
+        _log.exception("Error processing %s: %s", json_path, e)
         return {'abstract': None, 'conclusion': None}
 
-def update_database_with_sections(id, sections):
-    """Update the database with extracted sections and verify the update"""
+# Only overwrite columns for which a section was found
+UPDATE_SECTIONS_SQL = """
+    UPDATE full_documents 
+    SET abstract = COALESCE(?, abstract),
+        conclusion = COALESCE(?, conclusion)
+    WHERE id = ?
+"""
+
+def update_database_with_sections(new_sections):
+    """Update the database with all extracted sections in one transaction"""
+    rows = [(sections['abstract'], sections['conclusion'], id) for id, sections in new_sections.items()]
     try:
-        conn = sqlite3.connect(DB_PATH)
+        # Shared connection with WAL and synchronous=NORMAL already set
+        conn = get_conn(DB_PATH)
         c = conn.cursor()
         
-        # First check current values
-        c.execute("SELECT abstract, conclusion FROM full_documents WHERE id = ?", (id,))
-        current = c.fetchone()
-        if current:
-            print(f"\nCurrent values for {id}:")
-            print(f"Abstract: {current[0][:100] + '...' if current[0] else 'None'}")
-            print(f"Conclusion: {current[1][:100] + '...' if current[1] else 'None'}")
-        
-            # Only update if we have new content
-            update_abstract = sections['abstract'] is not None
-            update_conclusion = sections['conclusion'] is not None
-            
-            if update_abstract or update_conclusion:
-                # Construct dynamic UPDATE query
-                update_fields = []
-                params = []
-                if update_abstract:
-                    update_fields.append("abstract = ?")
-                    params.append(sections['abstract'])
-                if update_conclusion:
-                    update_fields.append("conclusion = ?")
-                    params.append(sections['conclusion'])
-                
-                query = f"""
-                    UPDATE full_documents 
-                    SET {', '.join(update_fields)}
-                    WHERE id = ?
-                """
-                params.append(id)
-                
-                c.execute(query, params)
-                conn.commit()
-                
-                # Verify the update
-                c.execute("SELECT abstract, conclusion FROM full_documents WHERE id = ?", (id,))
-                updated = c.fetchone()
-                print(f"\nUpdated values for {id}:")
-                print(f"Abstract: {updated[0][:100] + '...' if updated[0] else 'None'}")
-                print(f"Conclusion: {updated[1][:100] + '...' if updated[1] else 'None'}")
-                
-                if ((not update_abstract or updated[0] == sections['abstract']) and 
-                    (not update_conclusion or updated[1] == sections['conclusion'])):
-                    print(f"✓ Successfully updated database for ID: {id}")
-                    return True
-                else:
-                    print(f"⚠ Warning: Database update for {id} may not have been successful")
-                    return False
-            else:
-                print(f"No new content to update for {id}")
-                return False
-        else:
-            print(f"Error: Document {id} not found in database")
-            return False
+        # Write every document in a single transaction; SQLite either
+        # commits all rows or raises, so no read-back is needed
+        with conn:
+            c.executemany(UPDATE_SECTIONS_SQL, rows)
+        _log.info("✓ Updated %d documents in database", c.rowcount)
+        return True
             
     except sqlite3.Error as e:
-        print(f"Database error for {id}: {e}")
+        _log.error("Database error: %s", e)
         return False
-    finally:
-        conn.close()
+
+def load_sections():
+    """Load the combined sections JSON plus any entries appended to the JSONL sidecar"""
+    sections = {}
+    if SECTIONS_JSON_PATH.exists():
+        sections = orjson.loads(SECTIONS_JSON_PATH.read_bytes())
+    if SECTIONS_JSONL_PATH.exists():
+        with open(SECTIONS_JSONL_PATH, 'rb') as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    sections.update(orjson.loads(line))
+                except orjson.JSONDecodeError:
+                    # A run that crashed mid-write leaves a partial line; its
+                    # document is simply extracted again
+                    _log.warning("Skipping unreadable line %d of %s", number, SECTIONS_JSONL_PATH)
+    return sections
+
+def append_sections(new_sections):
+    """Append newly extracted sections to the JSONL sidecar, one document per line"""
+    with open(SECTIONS_JSONL_PATH, 'a+b') as f:
+        # End a partial line left by a crashed run, so the new entries start
+        # on a line of their own
+        if f.tell():
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
+        for id, sections in new_sections.items():
+            f.write(orjson.dumps({id: sections}) + b'\n')
+
+def finalize():
+    """Fold the JSONL sidecar into the combined sections JSON"""
+    sections = load_sections()
+    SECTIONS_JSON_PATH.write_bytes(orjson.dumps(sections, option=orjson.OPT_INDENT_2))
+    SECTIONS_JSONL_PATH.unlink(missing_ok=True)
+    _log.info("✓ Saved %d sections to %s", len(sections), SECTIONS_JSON_PATH)
+    return sections
 
 def main():
     """Main function to process documents and update database"""
     try:
         # First, check what documents we have JSON files for
         json_files = list(CONV_DIR.glob("*.json"))
-        print(f"Found {len(json_files)} JSON files in {CONV_DIR}")
+        _log.info("Found %d JSON files in %s", len(json_files), CONV_DIR)
         
         # Load existing sections if any
-        existing_sections = {}
-        if SECTIONS_JSON_PATH.exists():
-            with open(SECTIONS_JSON_PATH) as f:
-                existing_sections = json.load(f)
-            print(f"Loaded {len(existing_sections)} existing sections from {SECTIONS_JSON_PATH}")
+        existing_sections = load_sections()
+        if existing_sections:
+            _log.info("Loaded %d existing sections from %s", len(existing_sections), CONV_DIR)
         
         # Connect to database and get all document IDs
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
+        c = get_conn(DB_PATH).cursor()
         c.execute('SELECT id FROM full_documents')
         documents = c.fetchall()
-        conn.close()
 
         if not documents:
-            print("No documents found in database")
+            _log.info("No documents found in database")
             return
 
-        print(f"Found {len(documents)} documents in database")
+        _log.info("Found %d documents in database", len(documents))
         
-        extracted_sections = existing_sections.copy()
+        new_sections = {}
         successful_updates = 0
         skipped = 0
         failed = 0
         
+        pending = []
         for id, in documents:
             json_path = CONV_DIR / f"{id}.json"
             if json_path.exists():
                 if id in existing_sections:
-                    print(f"\nSkipping {id} - already processed")
+                    _log.debug("Skipping %s - already processed", id)
                     skipped += 1
                     continue
-                    
-                print(f"\nProcessing: {json_path}")
-                try:
-                    sections = extract_sections(json_path)
-                    if sections['abstract'] or sections['conclusion']:
-                        if update_database_with_sections(id, sections):
-                            extracted_sections[id] = sections
-                            successful_updates += 1
+                pending.append(id)
+            else:
+                _log.warning("JSON file not found: %s.json", id)
+                failed += 1
+
+        # Extract sections from all pending documents in parallel processes
+        if pending:
+            with ProcessPoolExecutor() as executor:
+                futures = {}
+                for id in pending:
+                    json_path = CONV_DIR / f"{id}.json"
+                    _log.debug("Processing: %s", json_path)
+                    futures[executor.submit(extract_sections, json_path)] = id
+                
+                for future in as_completed(futures):
+                    id = futures[future]
+                    try:
+                        sections = future.result()
+                        if sections['abstract'] or sections['conclusion']:
+                            new_sections[id] = sections
                         else:
+                            _log.debug("No sections found in %s", id)
                             failed += 1
-                    else:
-                        print(f"No sections found in {id}")
+                    except Exception as e:
+                        _log.error("Error processing %s: %s", id, e)
                         failed += 1
-                except Exception as e:
-                    print(f"Error processing {id}: {e}")
-                    failed += 1
+
+        # Write all extracted sections to the database in one batch
+        if new_sections:
+            if update_database_with_sections(new_sections):
+                # Only the new entries are written; earlier ones stay on disk as they are
+                append_sections(new_sections)
+                _log.info("✓ Appended %d sections to %s", len(new_sections), SECTIONS_JSONL_PATH)
+                successful_updates = len(new_sections)
             else:
-                print(f"JSON file not found: {id}.json")
-                failed += 1
+                failed += len(new_sections)
 
-        print(f"\nOperation Summary:")
-        print(f"- Total documents in database: {len(documents)}")
-        print(f"- JSON files found: {len(json_files)}")
-        print(f"- Previously processed: {len(existing_sections)}")
-        print(f"- Successfully processed: {successful_updates}")
-        print(f"- Skipped (already processed): {skipped}")
-        print(f"- Failed: {failed}")
-        
-        # Save all sections, including previously existing ones
-        with open(SECTIONS_JSON_PATH, 'w') as f:
-            json.dump(extracted_sections, f, indent=2)
-        print(f"✓ Saved {len(extracted_sections)} sections to {SECTIONS_JSON_PATH}")
+        _log.info("Operation Summary:")
+        _log.info("- Total documents in database: %d", len(documents))
+        _log.info("- JSON files found: %d", len(json_files))
+        _log.info("- Previously processed: %d", len(existing_sections))
+        _log.info("- Successfully processed: %d", successful_updates)
+        _log.info("- Skipped (already processed): %d", skipped)
+        _log.info("- Failed: %d", failed)
         
     except Exception as e:
-        print(f"Error in main: {str(e)}")
+        _log.error("Error in main: %s", e)
         raise
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Extract abstract and conclusion sections')
+    parser.add_argument('--finalize', action='store_true',
+                      help=f'Fold {SECTIONS_JSONL_PATH.name} into {SECTIONS_JSON_PATH.name} and exit')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=os.environ.get('LOGLEVEL', 'INFO'), format='%(message)s')
+    if args.finalize:
+        finalize()
+    else:
+        main() 
\ No newline at end of file
@@ -2,6 +2,8 @@ import sqlite3
 import arxiv
 from pathlib import Path
 import json
+from itertools import islice
+from _db import get_conn
 
 # Hardcoded query name
 QUERY_NAME = "JEPA"
@@ -32,51 +34,53 @@ def fetch_papers():
         sort_by=arxiv.SortCriterion.SubmittedDate
     )
 
-    # Convert iterator to list and slice to get exact number of results
-    results = list(search.results())[:max_results]
-    
-    papers = []
-    for result in results:
-        paper = {
+    # Stop consuming the result generator once max_results papers are read
+    papers = [
+        {
             'id': result.get_short_id(),
             'title': result.title,
-            'authors': ', '.join(author.name for author in result.authors),
+            'authors': ', '.join([author.name for author in result.authors]),
             'pdf_url': result.pdf_url
         }
-        papers.append(paper)
+        for result in islice(search.results(), max_results)
+    ]
     
     print(f"Fetched {len(papers)} papers (max_results={max_results})")
-    return papers  # Already limited by slicing results
+    return papers  # Already limited by islice
 
 def save_to_db(papers):
     """Save papers to database"""
     db_path = Path(__file__).parent.parent / "database" / "arxiv_docs.db"
     
     try:
-        conn = sqlite3.connect(db_path)
+        conn = get_conn(db_path)
         cursor = conn.cursor()
         
-        # Insert into full_documents table
-        cursor.executemany("""
-            INSERT OR REPLACE INTO full_documents 
-            (id, title, authors, pdf_url)
-            VALUES (?, ?, ?, ?)
-        """, [(p['id'], p['title'], p['authors'], p['pdf_url']) for p in papers])
+        full_document_rows = [(p['id'], p['title'], p['authors'], p['pdf_url']) for p in papers]
+        summary_rows = [(p['id'],) for p in papers]
         
-        # Initialize entries in summaries table
-        cursor.executemany("""
-            INSERT OR IGNORE INTO summaries (id)
-            VALUES (?)
-        """, [(p['id'],) for p in papers])
+        # Write both tables in a single explicit transaction
+        with conn:
+            # Upsert into full_documents table, keeping previously extracted sections
+            cursor.executemany("""
+                INSERT INTO full_documents (id, title, authors, pdf_url)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    title = excluded.title,
+                    authors = excluded.authors,
+                    pdf_url = excluded.pdf_url
+            """, full_document_rows)
+            
+            # Initialize entries in summaries table
+            cursor.executemany("""
+                INSERT OR IGNORE INTO summaries (id)
+                VALUES (?)
+            """, summary_rows)
         
-        conn.commit()
         print(f"Saved {len(papers)} papers to database")
         
     except sqlite3.Error as e:
         print(f"Database error: {e}")
-        
-    finally:
-        conn.close()
 
 def main():
     papers = fetch_papers()
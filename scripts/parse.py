@@ -1,5 +1,5 @@
 import logging
-import json
+import orjson
 from pathlib import Path
 from docling.backend.pypdfium2_backend import PyPdfiumDocumentBackend
 from docling.datamodel.base_models import InputFormat
@@ -26,6 +26,13 @@ def convert_pdfs():
         print("No PDF files found in pdfs directory")
         return
 
+    # Skip PDFs that already have a JSON conversion
+    pending_paths = [p for p in input_paths if not (out_path / f"{p.stem}.json").exists()]
+    
+    if not pending_paths:
+        print(f"All {len(input_paths)} PDF files already converted")
+        return
+
     # Configure converter with PDF-specific options
     doc_converter = DocumentConverter(
         allowed_formats=[InputFormat.PDF],
@@ -37,7 +44,7 @@ def convert_pdfs():
         },
     )
 
-    conv_results = doc_converter.convert_all(input_paths)
+    conv_results = doc_converter.convert_all(pending_paths)
 
     for res in conv_results:
         print(
@@ -45,9 +52,9 @@ def convert_pdfs():
             f"Saved JSON output to: {str(out_path)}"
         )
         
-        # Export to JSON using export_to_dict() and json.dump()
-        with (out_path / f"{res.input.file.stem}.json").open("w") as fp:
-            json.dump(res.document.export_to_dict(), fp, indent=2)
+        # Export to JSON using export_to_dict() and orjson.dumps()
+        json_path = out_path / f"{res.input.file.stem}.json"
+        json_path.write_bytes(orjson.dumps(res.document.export_to_dict()))
 
 def main():
     convert_pdfs()
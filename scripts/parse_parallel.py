@@ -1,10 +1,10 @@
 import logging
-import json
-import asyncio
+import orjson
+import os
 import time
 from pathlib import Path
-from itertools import cycle
-from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
 from docling.document_converter import (
     DocumentConverter,
     PdfFormatOption,
@@ -15,6 +15,9 @@ from docling.backend.pypdfium2_backend import PyPdfiumDocumentBackend
 
 _log = logging.getLogger(__name__)
 
+# Converter owned by the current process, created on first use
+_CONVERTER = None
+
 def create_converter():
     """Create a configured DocumentConverter instance with minimal processing"""
     # Get default options and modify them
@@ -37,8 +40,20 @@ def create_converter():
         },
     )
 
-async def convert_pdf(converter, pdf_path, out_path, instance_id):
-    """Convert a single PDF using the specified converter instance"""
+def get_converter():
+    """Return this process' converter, creating it on first use"""
+    global _CONVERTER
+    if _CONVERTER is None:
+        _CONVERTER = create_converter()
+    return _CONVERTER
+
+def init_worker():
+    """Load the converter when a worker starts so the first PDF doesn't pay for it"""
+    get_converter()
+
+def convert_pdf(pdf_path, out_path):
+    """Convert a single PDF using the worker process' converter"""
+    instance_id = f"worker{os.getpid()}"
     try:
         print(f"Instance {instance_id} starting: {pdf_path.name}")
         
@@ -46,19 +61,12 @@ async def convert_pdf(converter, pdf_path, out_path, instance_id):
         json_path = out_path / f"{pdf_path.stem}.json"
         if json_path.exists():
             print(f"Instance {instance_id} skipping {pdf_path.name} - output already exists")
-            return True
+            return None
         
-        # Run the conversion in a thread pool since docling's convert is blocking
-        loop = asyncio.get_event_loop()
-        with ThreadPoolExecutor(max_workers=1) as pool:
-            result = await loop.run_in_executor(
-                pool,
-                lambda: converter.convert(pdf_path)
-            )
+        result = get_converter().convert(pdf_path)
         
         # Export to JSON
-        with json_path.open("w") as fp:
-            json.dump(result.document.export_to_dict(), fp, indent=2)
+        json_path.write_bytes(orjson.dumps(result.document.export_to_dict()))
             
         print(f"✓ Instance {instance_id} completed: {pdf_path.name}")
         return True
@@ -67,8 +75,8 @@ async def convert_pdf(converter, pdf_path, out_path, instance_id):
         _log.error(f"Detailed error for {pdf_path.name}: {e}", exc_info=True)
         return False
 
-async def convert_pdfs_parallel():
-    """Convert PDF files to JSON format using parallel instances"""
+def convert_pdfs_parallel():
+    """Convert PDF files to JSON format using parallel worker processes"""
     start_time = time.time()
     
     # Setup paths relative to script location
@@ -84,30 +92,28 @@ async def convert_pdfs_parallel():
         print("No PDF files found in pdfs directory")
         return
 
-    print(f"\nFound {len(input_paths)} PDF files to process")
-    
-    # Create two converter instances with unique IDs
-    converters = [
-        (f"instance{i+1}", create_converter())
-        for i in range(2)
-    ]
+    # Skip PDFs that already have a JSON conversion, before any worker
+    # loads a converter
+    pending_paths = [p for p in input_paths if not (out_path / f"{p.stem}.json").exists()]
     
-    print(f"Created {len(converters)} parallel converter instances")
+    if not pending_paths:
+        print(f"All {len(input_paths)} PDF files already converted")
+        return
 
-    # Create tasks for parallel processing
-    tasks = []
-    for pdf_path, (instance_id, converter) in zip(input_paths, cycle(converters)):
-        task = convert_pdf(converter, pdf_path, out_path, instance_id)
-        tasks.append(task)
+    print(f"\nFound {len(pending_paths)} of {len(input_paths)} PDF files to process")
+    
+    # One worker process per core, each holding its own converter
+    max_workers = min(os.cpu_count() or 1, len(pending_paths))
+    print(f"Starting {max_workers} parallel converter processes")
     
     try:
-        # Run conversions in parallel with timeout
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker) as executor:
+            results = list(executor.map(convert_pdf, pending_paths, repeat(out_path)))
         
         # Count successes and failures
         successful = sum(1 for r in results if r is True)
-        failed = sum(1 for r in results if r is False or isinstance(r, Exception))
-        skipped = len(results) - successful - failed
+        failed = sum(1 for r in results if r is False)
+        skipped = len(input_paths) - successful - failed
         
         # Calculate elapsed time
         elapsed_time = time.time() - start_time
@@ -118,7 +124,7 @@ async def convert_pdfs_parallel():
         print(f"- Failed: {failed}")
         print(f"- Skipped (already exists): {skipped}")
         print(f"- Total time: {elapsed_time:.2f} seconds")
-        print(f"- Average time per file: {elapsed_time/len(input_paths):.2f} seconds")
+        print(f"- Average time per file: {elapsed_time/len(pending_paths):.2f} seconds")
         print(f"- Output directory: {out_path}")
         
     except Exception as e:
@@ -126,9 +132,9 @@ async def convert_pdfs_parallel():
         _log.error("Detailed error during parallel processing", exc_info=True)
         raise
 
-async def main():
+def main():
     try:
-        await convert_pdfs_parallel()
+        convert_pdfs_parallel()
     except KeyboardInterrupt:
         print("\nOperation cancelled by user")
     except Exception as e:
@@ -137,11 +143,9 @@ async def main():
 
 if __name__ == "__main__":
     try:
-        # Set up asyncio event loop
-        loop = asyncio.get_event_loop()
-        loop.run_until_complete(main())
+        main()
     except KeyboardInterrupt:
         print("\nOperation cancelled by user")
     except Exception as e:
         print(f"Fatal error: {str(e)}")
-        raise 
\ No newline at end of file
+        raise
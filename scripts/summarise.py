@@ -1,7 +1,14 @@
-import json
+import logging
+import os
+import asyncio
+import orjson
 import sqlite3
+from functools import lru_cache
 from pathlib import Path
-from ollama import Client
+from ollama import AsyncClient
+from _db import get_conn
+
+_log = logging.getLogger(__name__)
 
 # Define paths relative to script location
 SCRIPT_DIR = Path(__file__).parent
@@ -9,24 +16,61 @@ PROJECT_ROOT = SCRIPT_DIR.parent
 DB_DIR = PROJECT_ROOT / "database"
 DB_PATH = DB_DIR / "arxiv_docs.db"
 
+# Concurrent requests to send; match the server's OLLAMA_NUM_PARALLEL so
+# they are decoded together instead of queued
+NUM_PARALLEL = int(os.environ.get('OLLAMA_NUM_PARALLEL', 4))
+
+OLLAMA_HOST = os.environ.get('OLLAMA_HOST', 'http://localhost:11434')
+
+# How long Ollama keeps the model loaded after a request
+KEEP_ALIVE = os.environ.get('OLLAMA_KEEP_ALIVE', '30m')
+
+# Summaries saved per transaction, and the longest a finished one waits to be saved
+SAVE_BATCH = 50
+SAVE_INTERVAL = 2.0
+
+# Prompt for each (has_abstract, has_conclusion) combination
+_PROMPT_END = "Please provide a clear and concise summary of the key findings and implications."
+_PROMPT_TEMPLATES = {
+    (True, True): ("Here is the abstract and conclusion from a research paper:\n\n"
+                   "Abstract:\n{abstract}\n\nConclusion:\n{conclusion}\n\n" + _PROMPT_END),
+    (True, False): ("Here is the abstract from a research paper:\n\n"
+                    "Abstract:\n{abstract}\n\n" + _PROMPT_END),
+    (False, True): ("Here is the conclusion from a research paper:\n\n"
+                    "Conclusion:\n{conclusion}\n\n" + _PROMPT_END),
+}
+
+# Flag prepended to the summary for each (has_abstract, has_conclusion) combination
+_MISSING_FLAGS = {
+    (True, True): "",
+    (True, False): "(missing conclusion) ",
+    (False, True): "(missing abstract) ",
+}
+
+@lru_cache(maxsize=1)
 def load_config():
     """Load configuration from config/config.json"""
     config_path = PROJECT_ROOT / "config" / "config.json"
-    with open(config_path) as f:
-        config = json.load(f)
-    return config["models"]["summarise"]
+    return orjson.loads(config_path.read_bytes())["models"]["summarise"]
 
-def load_documents_from_db():
-    """Load documents from the SQLite database"""
+def load_documents_from_db(only_missing=True):
+    """Load documents from the SQLite database, by default only those without a summary"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
+        cursor = get_conn(DB_PATH).cursor()
         
-        # Get all documents, even those with missing sections
-        cursor.execute("""
-            SELECT id, abstract, conclusion 
-            FROM full_documents
-        """)
+        # Get all documents with at least one section; papers with neither
+        # would be skipped anyway. fetch.py adds an empty summaries row for
+        # every paper, so a paper still to do has a NULL summary rather
+        # than no row at all
+        query = """
+            SELECT f.id, f.abstract, f.conclusion 
+            FROM full_documents f
+            LEFT JOIN summaries s ON s.id = f.id
+            WHERE (f.abstract IS NOT NULL OR f.conclusion IS NOT NULL)
+        """
+        if only_missing:
+            query += " AND s.summary IS NULL"
+        cursor.execute(query)
         
         documents = {}
         for row in cursor.fetchall():
@@ -36,132 +80,167 @@ def load_documents_from_db():
                 'conclusion': conclusion if conclusion else ''
             }
         
-        print(f"\nLoaded {len(documents)} documents from database")
+        _log.info("Loaded %d documents from database", len(documents))
         return documents
         
     except sqlite3.Error as e:
-        print(f"Database error: {e}")
+        _log.error("Database error: %s", e)
         return {}
-    finally:
-        if 'conn' in locals():
-            conn.close()
 
-def summarise_paper(abstract, conclusion):
-    """Generate a summary using the configured model"""
-    config = load_config()
-    
-    # Initialize Ollama client
-    client = Client(host='http://localhost:11434')
-    
-    # Determine which sections are missing
-    missing_sections = []
-    if not abstract or abstract.strip() == '':
-        missing_sections.append('abstract')
-    if not conclusion or conclusion.strip() == '':
-        missing_sections.append('conclusion')
+async def summarise_paper(client, config, abstract, conclusion):
+    """Generate a summary using the configured model from already stripped sections"""
+    sections = (bool(abstract), bool(conclusion))
     
     # If both sections are missing, we can't generate a summary
-    if len(missing_sections) == 2:
-        print("Both abstract and conclusion are missing")
+    if sections not in _PROMPT_TEMPLATES:
+        _log.warning("Both abstract and conclusion are missing")
         return None
         
     # Build the prompt based on available sections
-    prompt = "Here is "
-    if abstract and abstract.strip():
-        prompt += "the abstract"
-        if conclusion and conclusion.strip():
-            prompt += " and conclusion"
-    else:
-        prompt += "the conclusion"
-    prompt += " from a research paper:\n\n"
-    
-    if abstract and abstract.strip():
-        prompt += f"Abstract:\n{abstract}\n\n"
-    if conclusion and conclusion.strip():
-        prompt += f"Conclusion:\n{conclusion}\n\n"
-    
-    prompt += "Please provide a clear and concise summary of the key findings and implications."
+    prompt = _PROMPT_TEMPLATES[sections].format(abstract=abstract, conclusion=conclusion)
 
     try:
-        response = client.generate(
+        response = await client.generate(
             model=config["model"],
             prompt=prompt,
             system=config["system_prompt"],
-            stream=False
+            stream=False,
+            keep_alive=KEEP_ALIVE  # Keep the model loaded between papers
         )
         
         if not response or 'response' not in response:
-            print("Error: No response from model")
+            _log.error("Error: No response from model")
             return None
             
         summary = response['response'].strip()
         if not summary:
-            print("Error: Empty summary")
+            _log.error("Error: Empty summary")
             return None
             
         # Add missing section flags at the start if needed
-        if missing_sections:
-            flags = [f"(missing {section})" for section in missing_sections]
-            summary = f"{' '.join(flags)} {summary}"
-            
-        return summary
+        return _MISSING_FLAGS[sections] + summary
         
     except Exception as e:
-        print(f"Error generating summary: {str(e)}")
+        _log.error("Error generating summary: %s", e)
         return None
 
-def save_summary_to_db(paper_id, summary):
-    """Save summary to the database"""
-    conn = None
+async def preload_model(client, config):
+    """Load the model before the first paper so it does not pay the load time"""
+    try:
+        # A request without a prompt only loads the model
+        await client.generate(model=config["model"], keep_alive=KEEP_ALIVE)
+    except Exception as e:
+        _log.warning("Error preloading model: %s", e)
+
+async def summarise_limited(semaphore, client, config, paper_id, abstract, conclusion, queue):
+    """Summarise one paper once a request slot is free, queueing the summary"""
+    async with semaphore:
+        summary = await summarise_paper(client, config, abstract, conclusion)
+    if summary:
+        _log.debug("Generated summary for paper %s", paper_id)
+        queue.put_nowait((paper_id, summary))
+
+async def summarise_papers(papers, config, queue):
+    """Generate summaries for {paper_id: (abstract, conclusion)} concurrently, queueing (paper_id, summary) rows"""
+    # One client per run: its connection pool belongs to this event loop
+    # and is shared by every request, at most NUM_PARALLEL at a time
+    client = AsyncClient(host=OLLAMA_HOST)
+    await preload_model(client, config)
+    
+    semaphore = asyncio.Semaphore(NUM_PARALLEL)
+    await asyncio.gather(*(
+        summarise_limited(semaphore, client, config, paper_id, abstract, conclusion, queue)
+        for paper_id, (abstract, conclusion) in papers.items()
+    ))
+
+async def save_worker(queue):
+    """Save (paper_id, summary) rows from queue as they arrive until None is queued
+
+    Rows are saved SAVE_BATCH at a time, or after SAVE_INTERVAL seconds if
+    fewer arrive, so finished summaries are on disk while the rest run.
+    """
+    loop = asyncio.get_running_loop()
+    finished = False
+    while not finished:
+        rows = []
+        row = await queue.get()
+        deadline = loop.time() + SAVE_INTERVAL
+        while row is not None:
+            rows.append(row)
+            if len(rows) == SAVE_BATCH:
+                break
+            try:
+                row = await asyncio.wait_for(queue.get(), deadline - loop.time())
+            except asyncio.TimeoutError:
+                break
+        finished = row is None
+        if rows:
+            save_summaries_to_db(rows)
+
+async def summarise_and_save(papers, config):
+    """Generate summaries while saving them as they come in"""
+    queue = asyncio.Queue()
+    saver = asyncio.create_task(save_worker(queue))
+    try:
+        await summarise_papers(papers, config, queue)
+    finally:
+        # Save whatever finished, even if summarising failed or was interrupted
+        queue.put_nowait(None)
+        await saver
+
+def save_summaries_to_db(rows):
+    """Save (paper_id, summary) rows to the database in one transaction"""
+    conn = get_conn(DB_PATH)
     try:
-        conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
-        
-        cursor.execute("""
+        cursor.executemany("""
             INSERT OR REPLACE INTO summaries (id, summary)
             VALUES (?, ?)
-        """, (paper_id, summary))
+        """, rows)
         
         conn.commit()
-        print(f"Saved summary for paper {paper_id}")
+        _log.info("Saved %d summaries", len(rows))
         
     except sqlite3.Error as e:
-        print(f"Database error for {paper_id}: {e}")
-        
-    finally:
-        if conn:
-            conn.close()
+        conn.rollback()
+        _log.error("Database error: %s", e)
 
 def main():
     """Process papers and generate summaries"""
     config = load_config()
-    print(f"\nUsing model: {config['model']}")
+    _log.info("Using model: %s", config['model'])
     
     # Load documents from database
     documents = load_documents_from_db()
     
     if not documents:
-        print("No documents found to summarize")
+        _log.info("No documents found to summarize")
         return
     
-    print(f"Found {len(documents)} papers to process")
+    _log.info("Found %d papers to process", len(documents))
     
-    # Generate and save summaries
+    papers = {}
     for paper_id, paper in documents.items():
-        print(f"\nProcessing {paper_id}...")
-        
         abstract = paper.get('abstract', '').strip()
         conclusion = paper.get('conclusion', '').strip()
         
         # Try to generate summary even if one section is missing
         if abstract or conclusion:  # At least one section must be present
-            summary = summarise_paper(abstract, conclusion)
-            if summary:
-                save_summary_to_db(paper_id, summary)
+            papers[paper_id] = (abstract, conclusion)
         else:
-            print(f"Skipping {paper_id} - no content available")
+            _log.debug("Skipping %s - no content available", paper_id)
+    
+    # Submit in order of prompt length so the requests Ollama decodes
+    # together are of similar length
+    papers = dict(sorted(papers.items(), key=lambda item: len(item[1][0]) + len(item[1][1])))
+    
+    # Generate summaries, saving them in chunks as they finish
+    _log.info("Processing %d papers with %d parallel requests...", len(papers), NUM_PARALLEL)
+    if papers:
+        asyncio.run(summarise_and_save(papers, config))
     
-    print("\nFinished processing all papers")
+    _log.info("Finished processing all papers")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=os.environ.get('LOGLEVEL', 'INFO'), format='%(message)s')
     main()
@@ -1,7 +1,9 @@
+import sys
 import sqlite3
-import json
+import orjson
 from pathlib import Path
 from datetime import datetime
+from itertools import chain
 
 # Define paths relative to script location
 SCRIPT_DIR = Path(__file__).parent  # testing directory
@@ -9,6 +11,9 @@ PROJECT_ROOT = SCRIPT_DIR.parent.parent  # go up two levels to reach project roo
 DB_PATH = PROJECT_ROOT / "database" / "arxiv_docs.db"
 DB_DIR = DB_PATH.parent  # Get database directory
 
+sys.path.insert(0, str(SCRIPT_DIR.parent))  # scripts directory, for the shared connection
+from _db import get_read_conn
+
 def dump_table_to_json(table_name, output_file, quiet=False):
     """
     Dump a database table to a JSON file
@@ -18,45 +23,51 @@ def dump_table_to_json(table_name, output_file, quiet=False):
         quiet (bool): If True, suppress print statements
     """
     try:
-        # Connect to database
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
+        # Connect to database; the whole dump is read in one transaction
+        # so it comes from a single snapshot
+        conn = get_read_conn(DB_PATH)
         c = conn.cursor()
+        c.execute("BEGIN DEFERRED")
         
-        # Get all records from table
+        # Stream records from table; column names are read once
         c.execute(f'SELECT * FROM {table_name}')
-        rows = c.fetchall()
+        columns = [column[0] for column in c.description]
+        first_row = c.fetchone()
         
-        if not rows:
+        if first_row is None:
             if not quiet:
                 print(f"No records found in {table_name}")
             return
         
-        # Convert rows to dictionary
-        documents = {}
-        for row in rows:
-            doc_dict = dict(row)
-            doc_id = doc_dict.pop('id')
-            documents[doc_id] = doc_dict
-        
-        # Save to JSON file
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(documents, f, indent=2, ensure_ascii=False)
+        # Write each record as it is read, in the same layout as an indented
+        # json.dump of the whole {id: record} dict
+        count = 0
+        first_id = first_doc = None
+        with open(output_file, 'wb', buffering=1 << 20) as f:
+            f.write(b"{\n")
+            for row in chain([first_row], c):
+                doc_dict = dict(zip(columns, row))
+                doc_id = doc_dict.pop('id')
+                if count:
+                    f.write(b",\n")
+                else:
+                    first_id, first_doc = doc_id, doc_dict
+                # Drop the per-record braces so only the entry remains
+                f.write(orjson.dumps({doc_id: doc_dict}, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)[2:-2])
+                count += 1
+            f.write(b"\n}")
             
         if not quiet:
             print(f"\n{table_name} dump summary:")
-            print(f"- Total records: {len(documents)}")
+            print(f"- Total records: {count}")
             print(f"- Output file: {output_file}")
             
             # Print sample of first document
-            if documents:
-                first_id = next(iter(documents))
-                print(f"\nSample record ({first_id}):")
-                first_doc = documents[first_id]
-                for key, value in first_doc.items():
-                    if value:
-                        preview = str(value)[:100] + "..." if len(str(value)) > 100 else value
-                        print(f"  {key}: {preview}")
+            print(f"\nSample record ({first_id}):")
+            for key, value in first_doc.items():
+                if value:
+                    preview = str(value)[:100] + "..." if len(str(value)) > 100 else value
+                    print(f"  {key}: {preview}")
         
     except sqlite3.Error as e:
         print(f"Database error: {e}")
@@ -65,8 +76,8 @@ def dump_table_to_json(table_name, output_file, quiet=False):
         print(f"Error: {e}")
         raise
     finally:
-        if 'conn' in locals():
-            conn.close()
+        if 'conn' in locals() and conn.in_transaction:
+            conn.execute("COMMIT")
 
 def dump_full_documents(quiet=False):
     """Dump the full_documents table to JSON"""
@@ -1,4 +1,5 @@
-import subprocess
+import os
+import runpy
 import shutil
 import time
 from pathlib import Path
@@ -13,13 +14,18 @@ PDF_DIR = PROJECT_ROOT / "pdfs"
 
 def clean_directory(directory: Path):
     """Remove all files in directory but keep the directory"""
-    if directory.exists():
-        for item in directory.iterdir():
-            if item.is_file():
-                item.unlink()
-            elif item.is_dir():
-                shutil.rmtree(item)
-        print(f"✓ Cleaned {directory}")
+    try:
+        # scandir returns the entry types with the listing, so only
+        # subdirectories need rmtree
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path)
+                else:
+                    os.unlink(entry.path)
+    except FileNotFoundError:
+        return
+    print(f"✓ Cleaned {directory}")
 
 def clean_all():
     """Clean all generated content"""
@@ -43,10 +49,17 @@ def run_script(script_name):
     script_path = SCRIPT_DIR / script_name
     try:
         print(f"\n[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Running {script_name}...")
-        result = subprocess.run(["python", str(script_path)], check=True)
+        # Run in this interpreter instead of starting a new Python per script
+        runpy.run_path(str(script_path), run_name="__main__")
         print(f"✓ {script_name} completed successfully")
         return True
-    except subprocess.CalledProcessError as e:
+    except SystemExit as e:
+        if e.code in (None, 0):
+            print(f"✓ {script_name} completed successfully")
+            return True
+        print(f"⚠ Error running {script_name}: exit code {e.code}")
+        return False
+    except Exception as e:
         print(f"⚠ Error running {script_name}: {e}")
         return False
 
@@ -3,14 +3,19 @@
 #   --start-from {clear,fetch,download,parse,extract,summarise}
 #                         Start workflow from a specific step
 #   --show-summaries      Run workflow and display summaries at the end
+#   --isolated            Run every step in its own Python process
 
 import os
-import json
+import sys
 import logging
+import fnmatch
+import importlib
+import subprocess
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional
 import sqlite3
+from _db import get_conn
 
 # Configure logging
 logging.basicConfig(
@@ -34,9 +39,24 @@ class WorkflowManager:
         'summarise': 'scripts/summarise.py'
     }
     
-    def __init__(self):
+    # Function each script is run through in-process; steps mapped to None
+    # run in their own interpreter instead. Steps run in-process share one
+    # SQLite connection per database through _db.get_conn and keep their
+    # modules' HTTP sessions and cached config. summarise still creates its
+    # Ollama client per run, as the client belongs to that run's event loop
+    ENTRY_POINTS = {
+        'clear': 'clear_database',
+        'fetch': 'main',
+        'download': 'download_job',
+        'parse': None,  # Isolated so docling's models are freed when parsing ends
+        'extract': 'main',
+        'summarise': 'main'
+    }
+    
+    def __init__(self, isolated: bool = False):
         self.script_dir = Path(__file__).parent
         self.project_root = self.script_dir.parent
+        self.isolated = isolated  # Run every step in its own interpreter, for debugging
         self.state: Dict[str, bool] = {}
         
         # Verify required files exist and are in scripts directory
@@ -57,40 +77,36 @@ class WorkflowManager:
     
     def _clear_directory(self, dir_path: Path, pattern: str = "*.json") -> None:
         """Clear all files matching pattern from directory"""
-        if not dir_path.exists():
+        count = 0
+        try:
+            # scandir returns the entry types with the listing, so files and
+            # symlinks can be unlinked without a stat per file
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    if not entry.is_dir(follow_symlinks=False) and fnmatch.fnmatch(entry.name, pattern):
+                        try:
+                            os.unlink(entry.path)
+                            count += 1
+                        except OSError as e:
+                            logging.error(f"Error deleting {entry.path}: {e}")
+        except FileNotFoundError:
             logging.warning(f"Directory not found: {dir_path}")
             return
-            
-        count = 0
-        for file in dir_path.glob(pattern):
-            try:
-                file.unlink()
-                count += 1
-            except Exception as e:
-                logging.error(f"Error deleting {file}: {e}")
         
         logging.info(f"Cleared {count} files from {dir_path}")
     
     def clear_workspace(self) -> bool:
         """Clear database and workspace files"""
         try:
-            # Clear database using venv python if available
-            logging.info("Clearing database...")
-            db_script = self.project_root / self.REQUIRED_FILES['clear']
-            
-            # Use the virtual environment's Python if available
-            python_cmd = str(self.project_root / "venv" / "bin" / "python")
-            if not Path(python_cmd).exists():
-                python_cmd = "python"
-                
-            result = os.system(f"{python_cmd} {db_script}")
-            if result != 0:
+            # Clear database
+            if not self._run_script('clear', "Clearing database"):
                 logging.error("Failed to clear database")
                 return False
             
             # Clear JSON files from conversions directory
             conversions_dir = self.project_root / "conversions"
             self._clear_directory(conversions_dir)
+            self._clear_directory(conversions_dir, "*.jsonl")
             
             # Clear PDF directory
             pdfs_dir = self.project_root / "pdfs"
@@ -109,23 +125,23 @@ class WorkflowManager:
     
     def fetch(self) -> bool:
         """Fetch new papers from arXiv"""
-        return self._run_script(self.REQUIRED_FILES['fetch'], "Fetching papers from arXiv")
+        return self._run_script('fetch', "Fetching papers from arXiv")
     
     def download(self) -> bool:
         """Download PDF files"""
-        return self._run_script(self.REQUIRED_FILES['download'], "Downloading PDFs")
+        return self._run_script('download', "Downloading PDFs")
     
     def parse(self) -> bool:
         """Parse PDF files"""
-        return self._run_script(self.REQUIRED_FILES['parse'], "Parsing PDFs")
+        return self._run_script('parse', "Parsing PDFs")
     
     def extract(self) -> bool:
         """Extract sections from parsed papers"""
-        return self._run_script(self.REQUIRED_FILES['extract'], "Extracting sections")
+        return self._run_script('extract', "Extracting sections")
     
     def summarise(self) -> bool:
         """Generate summaries"""
-        return self._run_script(self.REQUIRED_FILES['summarise'], "Generating summaries")
+        return self._run_script('summarise', "Generating summaries")
     
     def show_summaries(self) -> bool:
         """Display all summaries with their paper titles"""
@@ -134,8 +150,7 @@ class WorkflowManager:
             
             # Connect to database
             db_path = self.project_root / "database" / "arxiv_docs.db"
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
+            cursor = get_conn(db_path).cursor()
             
             # Get summaries with titles
             cursor.execute("""
@@ -171,9 +186,6 @@ class WorkflowManager:
         except Exception as e:
             logging.error(f"Error showing summaries: {e}")
             return False
-        finally:
-            if 'conn' in locals():
-                conn.close()
     
     def run_full_workflow(self, start_from: Optional[str] = None) -> bool:
         """
@@ -234,30 +246,69 @@ class WorkflowManager:
         """Get the status of each workflow step"""
         return self.state
     
-    def _run_script(self, script_name: str, description: str) -> bool:
-        """Run a Python script and handle its execution"""
-        script_path = self.project_root / script_name
+    def _run_script(self, step: str, description: str) -> bool:
+        """Run a workflow step's script and handle its execution"""
+        script_path = self.project_root / self.REQUIRED_FILES[step]
         if not script_path.exists():
-            logging.error(f"Script not found: {script_name}")
+            logging.error(f"Script not found: {self.REQUIRED_FILES[step]}")
             return False
             
         logging.info(f"Starting: {description}")
         try:
-            # Use the virtual environment's Python if available
-            python_cmd = str(self.project_root / "venv" / "bin" / "python")
-            if not Path(python_cmd).exists():
-                python_cmd = "python"
-                
-            result = os.system(f"{python_cmd} {script_path}")
-            success = result == 0
+            entry_point = None if self.isolated else self.ENTRY_POINTS.get(step)
+            if entry_point:
+                self._run_in_process(script_path, entry_point)
+                success = True
+            else:
+                result = self._run_subprocess(script_path)
+                success = result == 0
             if success:
                 logging.info(f"Completed: {description}")
             else:
                 logging.error(f"Failed: {description} (exit code: {result})")
             return success
+        except SystemExit as e:
+            if e.code in (None, 0):
+                logging.info(f"Completed: {description}")
+                return True
+            logging.error(f"Failed: {description} (exit code: {e.code})")
+            return False
         except Exception as e:
             logging.error(f"Error in {description}: {e}")
             return False
+    
+    def _run_in_process(self, script_path: Path, entry_point: str) -> None:
+        """Import a script as a module and call its entry point"""
+        if str(script_path.parent) not in sys.path:
+            sys.path.insert(0, str(script_path.parent))
+        module = importlib.import_module(script_path.stem)
+        getattr(module, entry_point)()
+    
+    def _run_subprocess(self, script_path: Path) -> int:
+        """Run a script in a separate interpreter and return its exit code"""
+        # Use the virtual environment's Python if available
+        python_cmd = str(self.project_root / "venv" / "bin" / "python")
+        if not Path(python_cmd).exists():
+            python_cmd = sys.executable
+        
+        # No shell in between; stderr bytes are passed through unchanged as
+        # they arrive, so progress bars redrawn with \r still render, and the
+        # last 64 KiB are kept so a failure's traceback also reaches the log
+        tail = bytearray()
+        sys.stderr.flush()
+        with subprocess.Popen([python_cmd, str(script_path)], stderr=subprocess.PIPE) as process:
+            while chunk := process.stderr.read1(1 << 16):
+                sys.stderr.buffer.write(chunk)
+                sys.stderr.buffer.flush()
+                tail += chunk
+                del tail[:-(1 << 16)]
+        
+        if process.returncode != 0 and tail:
+            # Keep only the final redraw of each \r-updated line
+            lines = [line.rsplit('\r', 1)[-1] for line in tail.decode(errors='replace').split('\n')]
+            lines = [line for line in lines if line.strip()][-50:]
+            logging.error(f"{script_path.name} stderr:\n" + '\n'.join(lines))
+        return process.returncode
 
 def main():
     """Run the workflow"""
@@ -269,10 +320,12 @@ def main():
                       help='Start workflow from a specific step')
     parser.add_argument('--show-summaries', action='store_true',
                       help='Run workflow and display summaries at the end')
+    parser.add_argument('--isolated', action='store_true',
+                      help='Run every step in its own Python process')
     args = parser.parse_args()
     
     try:
-        workflow = WorkflowManager()
+        workflow = WorkflowManager(isolated=args.isolated)
         
         # Run the workflow
         success = workflow.run_full_workflow(start_from=args.start_from)
@@ -0,0 +1,45 @@
+import atexit
+import sqlite3
+from functools import lru_cache
+from pathlib import Path
+
+# Define paths relative to script location
+SCRIPT_DIR = Path(__file__).parent  # test_relevance directory
+DB_PATH = SCRIPT_DIR / "database" / "arxiv_relevance.db"
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA temp_store=MEMORY",
+)
+
+def ensure_schema(conn):
+    """Add columns introduced since the database was created, if its tables exist"""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(full_documents)")]
+    if columns and 'author_affiliation' not in columns:
+        with conn:
+            conn.execute("ALTER TABLE full_documents ADD COLUMN author_affiliation TEXT")
+
+def close_conn(conn):
+    """Refresh planner statistics where needed and close the connection"""
+    try:
+        conn.execute("PRAGMA optimize")
+    except sqlite3.Error:
+        pass
+    conn.close()
+
+def get_conn(db_path=DB_PATH):
+    """Return the shared connection for db_path, opening it on first use"""
+    # Resolve first so every spelling of a path shares one connection
+    return _open_conn(Path(db_path).resolve())
+
+@lru_cache(maxsize=None)
+def _open_conn(db_path):
+    conn = sqlite3.connect(db_path)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    ensure_schema(conn)
+    atexit.register(close_conn, conn)
+    return conn
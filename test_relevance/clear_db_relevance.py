@@ -1,5 +1,6 @@
 import sqlite3
 from pathlib import Path
+from _db import get_conn
 
 # Define paths relative to script location
 SCRIPT_DIR = Path(__file__).parent  # test_relevance directory
@@ -8,25 +9,20 @@ DB_PATH = SCRIPT_DIR / "database" / "arxiv_relevance.db"
 def clear_database():
     """Clear all data from the database tables while preserving the schema"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_conn(DB_PATH)
         cursor = conn.cursor()
         
-        # Clear the summaries table
-        cursor.execute("DELETE FROM summaries")
+        # Clear both tables in a single transaction
+        with conn:
+            cursor.execute("DELETE FROM summaries")
+            cursor.execute("DELETE FROM full_documents")
         
-        # Clear the full_documents table
-        cursor.execute("DELETE FROM full_documents")
-        
-        # Commit the changes
-        conn.commit()
+        # DELETE leaves the freed pages in the file; reclaim them
+        cursor.execute("VACUUM")
         print("Successfully cleared all data from the database.")
         
     except sqlite3.Error as e:
         print(f"Database error: {e}")
-        
-    finally:
-        if 'conn' in locals():
-            conn.close()
 
 if __name__ == "__main__":
     clear_database() 
\ No newline at end of file
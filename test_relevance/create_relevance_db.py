@@ -1,5 +1,6 @@
 import sqlite3
 from pathlib import Path
+from _db import ensure_schema
 
 # Define paths relative to script location
 SCRIPT_DIR = Path(__file__).parent
@@ -22,6 +23,7 @@ def create_database():
                 title TEXT,
                 authors TEXT,
                 affiliation TEXT,
+                author_affiliation TEXT,
                 pdf_url TEXT,
                 abstract TEXT,
                 conclusion TEXT,
@@ -29,6 +31,9 @@ def create_database():
             )
         """)
 
+        # Databases created before author_affiliation was added
+        ensure_schema(conn)
+
         # Create summaries table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS summaries (
@@ -38,9 +43,18 @@ def create_database():
             )
         """)
 
+        # Index on the selection status: finding the papers still to evaluate
+        # scans only the unprocessed rows, and counting papers per status
+        # reads the index alone rather than the whole table
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_full_selected
+            ON full_documents (selected)
+        """)
+
         conn.commit()
         print(f"✓ Created database at {DB_PATH}")
         print("✓ Created tables: full_documents, summaries")
+        print("✓ Created index: idx_full_selected")
 
     except sqlite3.Error as e:
         print(f"Database error: {e}")
@@ -1,40 +1,74 @@
+import time
 import sqlite3
+import shutil
+import urllib3
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from pathlib import Path
-import time
+from concurrent.futures import ThreadPoolExecutor
+from _db import get_conn
 
 # Define paths relative to script location
 SCRIPT_DIR = Path(__file__).parent
 DB_PATH = SCRIPT_DIR / "database" / "arxiv_relevance.db"
 PDF_DIR = SCRIPT_DIR / "pdfs"
 
+# Number of concurrent downloads
+MAX_WORKERS = 8
+
+# Attempts per PDF; the adapter retries failed requests, but not errors
+# raised while the body is being read
+DOWNLOAD_ATTEMPTS = 3
+
+# Shared session so every download reuses the same keep-alive connections;
+# failed requests are retried with backoff, honouring Retry-After on 429
+SESSION = requests.Session()
+ADAPTER = HTTPAdapter(
+    pool_connections=MAX_WORKERS,
+    pool_maxsize=MAX_WORKERS,
+    max_retries=Retry(total=3, backoff_factor=2, status_forcelist=(429, 500, 502, 503, 504))
+)
+SESSION.mount('https://', ADAPTER)
+SESSION.mount('http://', ADAPTER)
+# PDFs are already compressed
+SESSION.headers.update({'Accept-Encoding': 'identity'})
+
 def download_pdf(url, file_path):
     """Download PDF from URL with retries"""
-    max_retries = 3
-    retry_delay = 2  # seconds
-    
-    for attempt in range(max_retries):
+    # Stream into a temporary file so a failed download never looks complete
+    part_path = file_path.with_suffix('.pdf.part')
+    for attempt in range(1, DOWNLOAD_ATTEMPTS + 1):
         try:
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-            
-            with open(file_path, 'wb') as f:
-                f.write(response.content)
+            with SESSION.get(url, timeout=30, stream=True) as response:
+                response.raise_for_status()
+                # Decode any Content-Encoding the server applies anyway
+                response.raw.decode_content = True
+                with open(part_path, 'wb') as f:
+                    shutil.copyfileobj(response.raw, f, length=1 << 20)
+            part_path.replace(file_path)
             return True
             
-        except requests.RequestException as e:
-            if attempt < max_retries - 1:
-                print(f"Retry {attempt + 1}/{max_retries} for {url}: {e}")
-                time.sleep(retry_delay)
-            else:
-                print(f"Failed to download {url}: {e}")
-                return False
+        except (requests.RequestException, urllib3.exceptions.HTTPError, OSError) as e:
+            # Reading response.raw raises urllib3's own errors for truncated
+            # or stalled bodies, which are not RequestExceptions
+            print(f"Failed to download {url} (attempt {attempt}/{DOWNLOAD_ATTEMPTS}): {e}")
+            part_path.unlink(missing_ok=True)
+            if attempt < DOWNLOAD_ATTEMPTS:
+                time.sleep(2 ** attempt)
+    return False
+
+def download_paper(paper):
+    """Download the PDF for a (paper_id, pdf_url, pdf_path) entry"""
+    paper_id, pdf_url, pdf_path = paper
+    print(f"\nDownloading PDF for {paper_id}...")
+    if download_pdf(pdf_url, pdf_path):
+        print(f"✓ Downloaded {paper_id}")
 
 def get_papers():
     """Get papers from database that need PDFs"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
+        cursor = get_conn(DB_PATH).cursor()
         
         cursor.execute("""
             SELECT id, pdf_url 
@@ -46,9 +80,6 @@ def get_papers():
     except sqlite3.Error as e:
         print(f"Database error: {e}")
         return []
-        
-    finally:
-        conn.close()
 
 def main():
     """Download PDFs for papers in database"""
@@ -62,20 +93,18 @@ def main():
     
     print(f"\nFound {len(papers)} papers to process")
     
-    # Download PDFs
+    # Skip papers that already have a PDF
+    pending = []
     for paper_id, pdf_url in papers:
         pdf_path = PDF_DIR / f"{paper_id}.pdf"
-        
         if pdf_path.exists():
             print(f"PDF already exists for {paper_id}")
-            continue
-            
-        print(f"\nDownloading PDF for {paper_id}...")
-        if download_pdf(pdf_url, pdf_path):
-            print(f"✓ Downloaded {paper_id}")
-        
-        # Be nice to the server
-        time.sleep(1)
+        else:
+            pending.append((paper_id, pdf_url, pdf_path))
+    
+    # Download PDFs in parallel over the shared session
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        list(executor.map(download_paper, pending))
     
     print("\nFinished downloading PDFs")
 
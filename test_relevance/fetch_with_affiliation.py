@@ -1,16 +1,51 @@
+import os
+import re
+import time
+import logging
 import sqlite3
 import arxiv
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import xml.etree.ElementTree as ET
 from pathlib import Path
 import json
-import time
+from _db import get_conn
+
+_log = logging.getLogger(__name__)
 
 # Define paths relative to script location
 SCRIPT_DIR = Path(__file__).parent  # test_relevance directory
 PROJECT_ROOT = SCRIPT_DIR.parent  # go up one level to reach project root
 DB_PATH = SCRIPT_DIR / "database" / "arxiv_relevance.db"
 CONFIG_PATH = PROJECT_ROOT / "config" / "config.json"
+ARXIV_API_URL = "https://export.arxiv.org/api/query"
+
+# Namespaces used in arXiv API Atom responses
+NAMESPACES = {'atom': 'http://www.w3.org/2005/Atom', 'arxiv': 'http://arxiv.org/schemas/atom'}
+
+# Words that mark an arXiv comment as naming an affiliation, matched
+# anywhere in the comment (so 'lab' also matches 'laboratory')
+AFFILIATION_RE = re.compile(r'university|institute|lab|corporation|inc\.|company', re.IGNORECASE)
+
+# Paper IDs per metadata request, and the wait between requests that
+# arXiv's API terms ask for (one request every 3 seconds)
+METADATA_BATCH_SIZE = 100
+REQUEST_DELAY = 3
+
+# Shared session so metadata requests reuse the same keep-alive connection;
+# transient failures are retried with backoff
+SESSION = requests.Session()
+SESSION.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+})
+ADAPTER = HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=1,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504))
+)
+SESSION.mount('https://', ADAPTER)
+SESSION.mount('http://', ADAPTER)
 
 def load_config():
     """Load configuration from config/config.json"""
@@ -25,51 +60,70 @@ def load_config():
         print(f"Missing key in config file: {e}")
         raise
 
-def get_paper_metadata(paper_id):
-    """Fetch paper metadata from arXiv API"""
-    # Use the metadata endpoint
-    metadata_url = f"https://export.arxiv.org/api/query?id_list={paper_id}"
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
+def get_papers_metadata(paper_ids):
+    """Fetch metadata for all papers from arXiv API in a single request
+
+    Returns {paper_id: (affiliation, author_affiliation)}, where affiliation
+    also includes comment text that looks like one, and author_affiliation
+    only the authors' affiliation tags.
+    """
+    # Use the metadata endpoint; id_list takes every paper at once
+    params = {'id_list': ','.join(paper_ids), 'max_results': len(paper_ids)}
     
     try:
-        response = requests.get(metadata_url, headers=headers)
+        response = SESSION.get(ARXIV_API_URL, params=params, timeout=30)
         response.raise_for_status()
         
         # Parse XML response
-        soup = BeautifulSoup(response.content, 'xml')
-        
-        # Find all affiliation tags
-        affiliations = []
+        root = ET.fromstring(response.content)
         
-        # Print raw XML for debugging
-        print(f"\nRaw XML for {paper_id}:")
-        print(response.text)
+        # Raw XML for debugging; only decoded when DEBUG is enabled
+        if _log.isEnabledFor(logging.DEBUG):
+            _log.debug("Raw XML for %d papers:\n%s", len(paper_ids), response.text)
         
-        # Try to find affiliations in different ways
-        for tag in soup.find_all(['arxiv:affiliation', 'affiliation']):
-            if tag.string:
-                aff = tag.string.strip()
-                print(f"Found affiliation: {aff}")
-                affiliations.append(aff)
-        
-        # Also check the comment field as it sometimes contains affiliation info
-        comment = soup.find('arxiv:comment')
-        if comment and comment.string:
-            comment_text = comment.string.strip()
-            if any(keyword in comment_text.lower() for keyword in ['university', 'institute', 'lab', 'corporation', 'inc.', 'company']):
-                print(f"Found affiliation in comment: {comment_text}")
-                affiliations.append(comment_text)
-        
-        if not affiliations:
-            print(f"No affiliations found for {paper_id}")
+        metadata = {}
+        for entry in root.iterfind('atom:entry', NAMESPACES):
+            # Entry ids are abstract URLs; key by paper ID without version number
+            paper_id = entry.findtext('atom:id', '', NAMESPACES).strip().rsplit('/abs/', 1)[-1].split('v')[0]
+            
+            # Find all affiliation tags, which sit inside each author
+            affiliations = []
+            for tag in entry.iterfind('.//arxiv:affiliation', NAMESPACES):
+                if tag.text:
+                    aff = tag.text.strip()
+                    _log.debug("Found affiliation: %s", aff)
+                    affiliations.append(aff)
             
-        return '; '.join(set(affiliations)) if affiliations else None
+            # Author tags alone, before any comment text is added
+            author_affiliations = '; '.join(set(affiliations)) if affiliations else None
+            
+            # Also check the comment field as it sometimes contains affiliation info
+            comment_text = entry.findtext('arxiv:comment', None, NAMESPACES)
+            if comment_text:
+                comment_text = comment_text.strip()
+                if AFFILIATION_RE.search(comment_text):
+                    _log.debug("Found affiliation in comment: %s", comment_text)
+                    affiliations.append(comment_text)
+            
+            if not affiliations:
+                print(f"No affiliations found for {paper_id}")
+                
+            metadata[paper_id] = ('; '.join(set(affiliations)) if affiliations else None, author_affiliations)
+        
+        return metadata
         
     except Exception as e:
-        print(f"Error fetching metadata for {paper_id}: {e}")
-        return None
+        print(f"Error fetching metadata for {', '.join(paper_ids)}: {e}")
+        return {}
+
+def fetch_metadata(paper_ids):
+    """Fetch metadata for all papers, in batches of METADATA_BATCH_SIZE fetched one after another"""
+    metadata = {}
+    for i in range(0, len(paper_ids), METADATA_BATCH_SIZE):
+        if i:
+            time.sleep(REQUEST_DELAY)
+        metadata.update(get_papers_metadata(paper_ids[i:i + METADATA_BATCH_SIZE]))
+    return metadata
 
 def fetch_papers():
     """Fetch papers from arXiv with increased max_results"""
@@ -85,13 +139,17 @@ def fetch_papers():
         sort_by=arxiv.SortCriterion.SubmittedDate
     )
 
+    results = list(search.results())
+    
+    # Get paper IDs without version number
+    paper_ids = [result.get_short_id().split('v')[0] for result in results]
+    
+    # Get metadata including affiliations, one request per batch of papers
+    metadata = fetch_metadata(paper_ids)
+    
     papers = []
-    for result in search.results():
-        # Get paper ID without version number
-        paper_id = result.get_short_id().split('v')[0]
-        
-        # Get metadata including affiliations
-        affiliations = get_paper_metadata(paper_id)
+    for paper_id, result in zip(paper_ids, results):
+        affiliations, author_affiliations = metadata.get(paper_id, (None, None))
         print(f"Found affiliations for {paper_id}: {affiliations}")
         
         paper = {
@@ -99,55 +157,65 @@ def fetch_papers():
             'title': result.title,
             'authors': ', '.join(author.name for author in result.authors),
             'affiliation': affiliations,
+            'author_affiliation': author_affiliations,
             'pdf_url': result.pdf_url,
             'abstract': result.summary,
             'conclusion': None  # Will be populated by extract_regex later
         }
         papers.append(paper)
-        
-        # Be nice to the API
-        time.sleep(1)
     
     return papers
 
-def save_to_db(papers):
+def save_to_db(conn, papers):
     """Save papers to database"""
     try:
-        conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
         
-        # Save to full_documents table
-        cursor.executemany("""
-            INSERT OR REPLACE INTO full_documents 
-            (id, title, authors, affiliation, pdf_url, abstract, conclusion, selected)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, [(p['id'], p['title'], p['authors'], p['affiliation'], 
-               p['pdf_url'], p['abstract'], p['conclusion'], None) for p in papers])
-        
-        # Initialize entries in summaries table
-        cursor.executemany("""
-            INSERT OR IGNORE INTO summaries (id)
-            VALUES (?)
-        """, [(p['id'],) for p in papers])
+        # Write both tables in a single transaction
+        with conn:
+            # Save to full_documents table, updating papers already there in
+            # place rather than deleting and reinserting them
+            cursor.executemany("""
+                INSERT INTO full_documents 
+                (id, title, authors, affiliation, author_affiliation, pdf_url, abstract, conclusion, selected)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET
+                    title = excluded.title,
+                    authors = excluded.authors,
+                    affiliation = excluded.affiliation,
+                    author_affiliation = excluded.author_affiliation,
+                    pdf_url = excluded.pdf_url,
+                    abstract = excluded.abstract,
+                    conclusion = excluded.conclusion,
+                    selected = excluded.selected
+            """, [(p['id'], p['title'], p['authors'], p['affiliation'], p['author_affiliation'],
+                   p['pdf_url'], p['abstract'], p['conclusion'], None) for p in papers])
+            
+            # Initialize entries in summaries table
+            cursor.executemany("""
+                INSERT INTO summaries (id)
+                VALUES (?)
+                ON CONFLICT (id) DO NOTHING
+            """, [(p['id'],) for p in papers])
         
-        conn.commit()
+        # Refresh the query planner's statistics now the tables hold the new rows
+        conn.execute("ANALYZE")
         print(f"Saved {len(papers)} papers to database")
         
     except sqlite3.Error as e:
         print(f"Database error: {e}")
-        
-    finally:
-        conn.close()
 
 def main():
     """Fetch papers and save to database"""
     print("\nFetching papers from arXiv...")
     papers = fetch_papers()
     if papers:
-        save_to_db(papers)
+        # Shared connection with WAL and synchronous=NORMAL already set
+        save_to_db(get_conn(DB_PATH), papers)
         print("✓ Finished fetching papers with affiliations")
     else:
         print("No papers found")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=os.environ.get('LOGLEVEL', 'INFO'), format='%(message)s')
     main() 
\ No newline at end of file
@@ -1,22 +1,69 @@
+import os
+import re
 import json
+import asyncio
 import sqlite3
+from functools import lru_cache
 from pathlib import Path
-from ollama import Client
-from pydantic import BaseModel
+from ollama import AsyncClient
+from pydantic import BaseModel, TypeAdapter
+from _db import get_conn
 
 # Define the response schema
 class PaperEvaluation(BaseModel):
     is_prestigious: bool
     reason: str  # Added to capture the reasoning
 
+# Result for one paper of a batched prompt, naming the [index] it answers
+class IndexedEvaluation(PaperEvaluation):
+    index: int
+
+# Response schema for a prompt covering several papers, one result per paper
+class BatchedEvaluation(BaseModel):
+    results: list[IndexedEvaluation]
+
+# JSON schemas passed as the response format and validators for the
+# replies, built once rather than per request
+_SCHEMA = PaperEvaluation.model_json_schema()
+_BATCH_SCHEMA = BatchedEvaluation.model_json_schema()
+_VALIDATOR = TypeAdapter(PaperEvaluation)
+_BATCH_VALIDATOR = TypeAdapter(BatchedEvaluation)
+
 # Define paths relative to script location
 SCRIPT_DIR = Path(__file__).parent  # test_relevance directory
 PROJECT_ROOT = SCRIPT_DIR.parent  # go up one level to reach project root
 DB_PATH = SCRIPT_DIR / "database" / "arxiv_relevance.db"
 CONFIG_PATH = PROJECT_ROOT / "config" / "config.json"
 
+OLLAMA_HOST = os.environ.get('OLLAMA_HOST', 'http://localhost:11434')
+
+# Concurrent requests to send; match the server's OLLAMA_NUM_PARALLEL so
+# they are decoded together instead of queued
+NUM_PARALLEL = int(os.environ.get('OLLAMA_NUM_PARALLEL', 4))
+
+# Papers evaluated per prompt
+BATCH_SIZE = 5
+
+# Evaluations saved per transaction, and the longest a finished one waits to be saved
+SAVE_BATCH = 50
+SAVE_INTERVAL = 2.0
+
+# Institutions prestigious enough to select a paper without asking the model,
+# matched against the authors' affiliation tags only: the affiliation shown
+# to the model can also hold comment text, such as "under the MIT license".
+# Places that are also towns or company names are listed by their full
+# institution name, so "Cambridge, MA" or "Berkeley Lab" still go to the model
+PRESTIGIOUS = [
+    "MIT", "Massachusetts Institute of Technology", "Stanford", "CMU", "Carnegie Mellon",
+    "UC Berkeley", "University of California, Berkeley", "Harvard", "Princeton",
+    "University of Oxford", "University of Cambridge", "ETH Zurich",
+    "Google", "DeepMind", "Meta AI", "OpenAI", "Anthropic", "Microsoft Research",
+]
+PRESTIGIOUS_RE = re.compile(r'\b(?:' + '|'.join(map(re.escape, PRESTIGIOUS)) + r')\b')
+
+@lru_cache(maxsize=1)
 def load_config():
-    """Load configuration from config/config.json"""
+    """Load configuration from config/config.json, read once per run"""
     try:
         with open(CONFIG_PATH) as f:
             config = json.load(f)
@@ -28,56 +75,49 @@ def load_config():
         print(f"Missing key in config file: {e}")
         raise
 
-def load_papers():
-    """Load papers from database that haven't been evaluated yet"""
+def iter_papers(conn, limit=None):
+    """Yield (paper_id, paper) for up to limit papers that haven't been evaluated yet, as rows are read"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT id, title, authors, affiliation, abstract 
+        # Served from the idx_full_selected index; a negative LIMIT means no limit
+        cursor = conn.execute("""
+            SELECT id, title, authors, affiliation, author_affiliation, abstract 
             FROM full_documents 
             WHERE selected IS NULL
-        """)
+            ORDER BY rowid
+            LIMIT ?
+        """, (-1 if limit is None else limit,))
         
-        papers = {}
-        for row in cursor.fetchall():
-            doc_id, title, authors, affiliation, abstract = row
-            papers[doc_id] = {
+        for doc_id, title, authors, affiliation, author_affiliation, abstract in cursor:
+            yield doc_id, {
                 'title': title,
                 'authors': authors,
                 'affiliation': affiliation if affiliation else "Not provided",
+                'author_affiliation': author_affiliation,
                 'abstract': abstract
             }
         
-        return papers
     except sqlite3.Error as e:
         print(f"Database error: {e}")
-        return {}
-    finally:
-        if 'conn' in locals():
-            conn.close()
 
-def evaluate_paper(paper):
-    """Evaluate paper using LLM based on affiliation prestige"""
-    config = load_config()
-    
-    # Initialize Ollama client
-    client = Client(host='http://localhost:11434')
-    
-    prompt = f"""Paper Information:
-Title: {paper['title']}
+def paper_info(paper):
+    """Format the fields of a paper the model is shown"""
+    return f"""Title: {paper['title']}
 Authors: {paper['authors']}
 Affiliation: {paper['affiliation']}
-Abstract: {paper['abstract']}
+Abstract: {paper['abstract']}"""
+
+async def evaluate_paper(client, config, paper):
+    """Evaluate paper using LLM based on affiliation prestige"""
+    prompt = f"""Paper Information:
+{paper_info(paper)}
 
 Analyze the affiliation information and determine if this is from a prestigious institution."""
 
     try:
-        response = client.generate(
+        response = await client.generate(
             model=config["model"],
             prompt=prompt,
-            format=PaperEvaluation.model_json_schema(),
+            format=_SCHEMA,
             stream=False
         )
         
@@ -85,7 +125,7 @@ Analyze the affiliation information and determine if this is from a prestigious
         print(response['response'])
         
         try:
-            result = PaperEvaluation.model_validate_json(response['response'])
+            result = _VALIDATOR.validate_json(response['response'])
             print(f"Decision: {'Prestigious' if result.is_prestigious else 'Not prestigious'}")
             print(f"Reason: {result.reason}")
             return 'yes' if result.is_prestigious else 'no'
@@ -97,41 +137,146 @@ Analyze the affiliation information and determine if this is from a prestigious
         print(f"Error evaluating paper: {str(e)}")
         return 'no'  # Default to 'no' if there's an error
 
-def save_evaluation(paper_id, selection):
-    """Save evaluation result to database"""
-    conn = None
+async def evaluate_batch(client, config, papers):
+    """Evaluate a list of papers in one prompt, falling back to one prompt per paper"""
+    entries = "\n\n".join(f"[{i}] {paper_info(paper)}" for i, paper in enumerate(papers, 1))
+    prompt = f"""Evaluate each paper. Return JSON {{"results": [...]}} with one entry per paper, each giving the paper's [index] as "index".
+
+{entries}
+
+For each paper, analyze the affiliation information and determine if it is from a prestigious institution."""
+
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            UPDATE full_documents 
-            SET selected = ?
-            WHERE id = ?
-        """, (selection, paper_id))
+        response = await client.generate(
+            model=config["model"],
+            prompt=prompt,
+            format=_BATCH_SCHEMA,
+            stream=False
+        )
         
-        conn.commit()
-        if selection == 'yes':
-            print(f"Selected paper {paper_id}")
-        else:
-            print(f"Rejected paper {paper_id}")
+        print("\nModel response:")
+        print(response['response'])
         
-    except sqlite3.Error as e:
-        print(f"Database error for {paper_id}: {e}")
+        # Match results to papers by index rather than position
+        results = {result.index: result for result in _BATCH_VALIDATOR.validate_json(response['response']).results}
+        if sorted(results) != list(range(1, len(papers) + 1)):
+            raise ValueError(f"expected indices 1-{len(papers)}, got {sorted(results)}")
+        results = [results[i] for i in range(1, len(papers) + 1)]
+        for result in results:
+            print(f"Decision: {'Prestigious' if result.is_prestigious else 'Not prestigious'}")
+            print(f"Reason: {result.reason}")
+        return ['yes' if result.is_prestigious else 'no' for result in results]
         
+    except Exception as e:
+        print(f"Error evaluating batch, evaluating papers one by one: {e}")
+        return [await evaluate_paper(client, config, paper) for paper in papers]
+
+async def evaluate_limited(semaphore, client, config, batch, queue):
+    """Evaluate one batch of (paper_id, paper) once a request slot is free, queueing the results"""
+    async with semaphore:
+        paper_ids = [paper_id for paper_id, _ in batch]
+        print(f"\nEvaluating {', '.join(paper_ids)}...")
+        selections = await evaluate_batch(client, config, [paper for _, paper in batch])
+        for paper_id, selection in zip(paper_ids, selections):
+            queue.put_nowait((selection, paper_id))
+
+async def evaluate_papers(papers, config, queue, reading_done):
+    """Evaluate (paper_id, paper) items concurrently, queueing (selection, paper_id) results
+
+    Sets reading_done once every paper has been read, and returns how many were.
+    """
+    # One client per run: its connection pool belongs to this event loop
+    # and is shared by every request, at most NUM_PARALLEL at a time
+    client = AsyncClient(host=OLLAMA_HOST)
+    semaphore = asyncio.Semaphore(NUM_PARALLEL)
+    
+    # Papers whose authors list a plainly prestigious affiliation are selected outright.
+    # Send each batch of BATCH_SIZE other papers as soon as its rows are
+    # read, yielding to the event loop so requests start while the rest are
+    count, tasks, batch = 0, [], []
+    for paper_id, paper in papers:
+        count += 1
+        if paper['author_affiliation'] and PRESTIGIOUS_RE.search(paper['author_affiliation']):
+            print(f"\nPrestigious affiliation for {paper_id}, skipping model")
+            queue.put_nowait(('yes', paper_id))
+            continue
+        batch.append((paper_id, paper))
+        if len(batch) == BATCH_SIZE:
+            tasks.append(asyncio.create_task(evaluate_limited(semaphore, client, config, batch, queue)))
+            batch = []
+            await asyncio.sleep(0)
+    if batch:
+        tasks.append(asyncio.create_task(evaluate_limited(semaphore, client, config, batch, queue)))
+    reading_done.set()
+    
+    await asyncio.gather(*tasks)
+    return count
+
+async def save_worker(conn, queue, reading_done):
+    """Save (selection, paper_id) results from queue as they arrive until None is queued
+
+    Results are saved SAVE_BATCH at a time, or after SAVE_INTERVAL seconds
+    if fewer arrive, so finished evaluations are on disk while the rest run.
+    """
+    # Nothing is written until every paper has been read, so the connection
+    # never updates full_documents while its own SELECT is still open
+    await reading_done.wait()
+    
+    loop = asyncio.get_running_loop()
+    finished = False
+    while not finished:
+        rows = []
+        row = await queue.get()
+        deadline = loop.time() + SAVE_INTERVAL
+        while row is not None:
+            rows.append(row)
+            if len(rows) == SAVE_BATCH:
+                break
+            try:
+                row = await asyncio.wait_for(queue.get(), deadline - loop.time())
+            except asyncio.TimeoutError:
+                break
+        finished = row is None
+        if rows:
+            save_evaluations(conn, rows)
+
+async def evaluate_and_save(conn, papers, config):
+    """Evaluate papers while saving the results as they come in, returning how many were evaluated"""
+    queue = asyncio.Queue()
+    reading_done = asyncio.Event()
+    saver = asyncio.create_task(save_worker(conn, queue, reading_done))
+    try:
+        return await evaluate_papers(papers, config, queue, reading_done)
     finally:
-        if conn:
-            conn.close()
+        # Save whatever finished, even if evaluation failed
+        reading_done.set()
+        queue.put_nowait(None)
+        await saver
 
-def cleanup_unselected():
-    """Update statistics about selected/rejected papers"""
-    conn = None
+def save_evaluations(conn, rows):
+    """Save (selection, paper_id) evaluation results to database in one transaction"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
+        with conn:
+            conn.executemany("""
+                UPDATE full_documents 
+                SET selected = ?
+                WHERE id = ?
+            """, rows)
+        
+        for selection, paper_id in rows:
+            if selection == 'yes':
+                print(f"Selected paper {paper_id}")
+            else:
+                print(f"Rejected paper {paper_id}")
         
-        # Count papers by selection status
-        cursor.execute("""
+    except sqlite3.Error as e:
+        print(f"Database error: {e}")
+
+def cleanup_unselected(conn):
+    """Update statistics about selected/rejected papers"""
+    try:
+        # Count papers by selection status, from the idx_full_selected index alone
+        cursor = conn.execute("""
             SELECT selected, COUNT(*) 
             FROM full_documents 
             GROUP BY selected
@@ -149,34 +294,37 @@ def cleanup_unselected():
         
     except sqlite3.Error as e:
         print(f"Database error during statistics gathering: {e}")
-        
-    finally:
-        if conn:
-            conn.close()
 
-def main():
-    """Process papers and evaluate their relevance"""
+def main(limit=None):
+    """Process papers, at most limit of them if given, and evaluate their relevance"""
     config = load_config()
     print(f"\nUsing model: {config['model']}")
     
-    # Load papers
-    papers = load_papers()
+    # One connection for the whole run; _db closes it at exit
+    conn = get_conn(DB_PATH)
+    
+    # Stream papers from the database straight into evaluation
+    papers = iter_papers(conn, limit)
     
-    if not papers:
+    # Evaluate papers concurrently, saving results as they finish; start
+    # the server with OLLAMA_NUM_PARALLEL set so it decodes them together
+    count = asyncio.run(evaluate_and_save(conn, papers, config))
+    if not count:
         print("No papers found to evaluate")
         return
     
-    print(f"Found {len(papers)} papers to evaluate")
+    print(f"\nEvaluated {count} papers")
     
-    # Evaluate papers
-    for paper_id, paper in papers.items():
-        print(f"\nEvaluating {paper_id}...")
-        selection = evaluate_paper(paper)
-        save_evaluation(paper_id, selection)
-    
-    # Clean up unselected papers
-    cleanup_unselected()
+    # Report selection statistics
+    cleanup_unselected(conn)
     print("\nFinished processing papers")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Evaluate the relevance of fetched papers')
+    parser.add_argument('--limit', type=int,
+                      help='Evaluate at most this many unevaluated papers, oldest first')
+    args = parser.parse_args()
+    
+    main(args.limit)
\ No newline at end of file